@@ -1,35 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import json
 from pathlib import Path
 import os
+import re
+import threading
+import time
+from typing import Callable, Optional, TextIO
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from packaging.version import parse
+from packaging.version import InvalidVersion, Version, parse
 import jsonschema
-from jsonschema import validate
 
-MAIN_DIR = os.path.dirname(os.path.realpath(__file__))
+MAIN_DIR = Path(__file__).resolve().parent
+CONFIG_PATH = MAIN_DIR / "config.json"
 
-with open(Path(MAIN_DIR + "/" + "./config.json"), "r") as main_config:
+with open(CONFIG_PATH, "r") as main_config:
     MAIN_CONFIG = json.load(main_config)
 
-with open(Path(MAIN_DIR + "/" + MAIN_CONFIG["dh_api_scheme"]), "r") as dh_schema:
+with open(MAIN_DIR / MAIN_CONFIG["dh_api_scheme"], "r") as dh_schema:
     DH_SCHEMA = json.load(dh_schema)
 
-DOWNLOADED_MODELS = Path(MAIN_DIR + "/" + MAIN_CONFIG["file_path_for_save_download_history"])
+_validator_class = jsonschema.validators.validator_for(DH_SCHEMA)
+_validator_class.check_schema(DH_SCHEMA)
+DH_VALIDATOR = _validator_class(DH_SCHEMA)
+
+DOWNLOADED_MODELS = MAIN_DIR / MAIN_CONFIG["file_path_for_save_download_history"]
 END_FOLDER = Path(MAIN_CONFIG["folder_for_package_save"])
 
+POOL_SIZE = 16
+PING_TIMEOUT = (3, 30)
+DOWNLOAD_TIMEOUT = (3, 60)
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+CONTENT_DISPOSITION_FILENAME = re.compile(r'\bfilename="?([^";]+)', re.IGNORECASE)
+# Page cache hints for the downloaded packages, os.posix_fadvise is not available on Windows and macOS
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE,
+                       max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+INCIDENTS = {
+    ("Info", 0): "JSON was decode",
+    ("Info", 1): "Package was download from URL: {url_path}",
+    ("Warning", 0): "JSON is not valid",
+    ("Warning", 1): "JSON did not loaded from URL: {url_path}",
+    ("Warning", 2): "Package download was cancelled from URL: {url_path}",
+    ("Error", 0): "No version was found in {url_name_list}",
+    ("Error", 1): "Package download error from URL: {url_path}",
+    ("Disaster", 0): "No one package was downloaded"
+}
+
+# Validators by their id with the patterns for the fast check in is_json_valid, see get_field_patterns.
+# The validator is kept in the value, so its id can't be reused by another object.
+_field_patterns_cache = {}
+
+# The second and its formatted date and time, the log messages reuse it until the second changes
+_log_second_cache = (None, "")
+
+
+def get_field_patterns(json_schema: dict) -> dict:
+    """
+    Compile the patterns for the fast check in is_json_valid.
+    They are exact only for a scheme with a single string field, like dh-response-scheme.json,
+    for any other scheme the dict is empty and the full validation is always used.
+    :param json_schema: Confirmation scheme
+    :return: Dict with a field name as a key and a compiled pattern as a value.
+    """
+    properties = json_schema.get("properties", {})
+    if not (set(json_schema) <= {"type", "required", "properties"}
+            and json_schema.get("type", "object") == "object"
+            and len(properties) == 1
+            and set(json_schema.get("required", [])) <= set(properties)):
+        return {}
+    return {field: re.compile(field_schema["pattern"]) for field, field_schema in properties.items()
+            if set(field_schema) == {"type", "pattern"} and field_schema["type"] == "string"}
 
-def is_json_valid(json_data: dict, json_schema: dict) -> bool:
+
+def is_json_valid(json_data: dict, json_validator: jsonschema.protocols.Validator, searched_field: Optional[str] = None) -> bool:
     """
-    Func for validate json by the python module jsonschema
+    Func for validate json by the python module jsonschema.
+    If the searched field matches its pattern from the validator's scheme, the full validation is skipped.
     :param json_data: Dictionary for confirmation
-    :param json_schema: Confirmation scheme
+    :param json_validator: Validator built once from the confirmation scheme, for example: DH_VALIDATOR
+    :param searched_field: The key of the value for the fast check, for example: "modelsVersion"
     :return: Bool, The True if the dict is valid, and False if not.
     """
+    cached = _field_patterns_cache.get(id(json_validator))
+    if cached is None or cached[0] is not json_validator:
+        cached = (json_validator, get_field_patterns(json_validator.schema))
+        _field_patterns_cache[id(json_validator)] = cached
+    pattern = cached[1].get(searched_field)
+    if pattern and isinstance(json_data, dict):
+        value = json_data.get(searched_field)
+        if isinstance(value, str) and pattern.search(value):
+            return True
+
     try:
-        validate(instance=json_data, schema=json_schema)
-    except jsonschema.exceptions.ValidationError as err:
+        json_validator.validate(json_data)
+    except jsonschema.exceptions.ValidationError:
         return False
     return True
 
@@ -37,16 +110,39 @@ def is_json_valid(json_data: dict, json_schema: dict) -> bool:
 def determine_senior_version(model_versions: dict) -> str:
     """
     Check dict value and determine most latest version
-    :param model_versions: Dictionary with numbers of version as value.
+    :param model_versions: Dictionary with numbers of version as value, all of them are valid versions.
         for example: "{'dh1': '1.0.166.1', 'dh2': '1.0.198.0', 'addin': '1.0.198.0'}"
     :return: String with most latest version.
         for example: "1.0.198.0"
     """
-    senior_ver = parse("0.0")
-    for ver in model_versions.values():
-        if senior_ver < parse(ver):
-            senior_ver = parse(ver)
-    return str(senior_ver)
+    return max(model_versions.values(), key=parse)
+
+
+def get_log_timestamp() -> str:
+    """
+    The func returns current date and time in the same format as str(datetime.now())
+    :return: for example: "2021-03-04 12:30:45.123456"
+    """
+    global _log_second_cache
+    second, microsecond = divmod(time.time_ns() // 1000, 1000000)
+    cached_second, formatted_second = _log_second_cache
+    if second != cached_second:
+        formatted_second = datetime.fromtimestamp(second).isoformat(" ")
+        _log_second_cache = (second, formatted_second)
+    # str(datetime) omits the microseconds when they are zero
+    return f"{ formatted_second }.{ microsecond:06d}" if microsecond else formatted_second
+
+
+def parse_version(model_version: str) -> Optional[Version]:
+    """
+    Parse the version string without raising on the strings which are not PEP 440 versions
+    :param model_version: for example: 1.0.198
+    :return: The version, or None if the string is not a valid version
+    """
+    try:
+        return parse(model_version)
+    except InvalidVersion:
+        return None
 
 
 def new_create_log_message(incident_name: str, **kwargs) -> str:
@@ -61,38 +157,16 @@ def new_create_log_message(incident_name: str, **kwargs) -> str:
     url_name = kwargs["url_name"].lower() if "url_name" in kwargs else None
     url_path = kwargs["url_path"].lower() if "url_path" in kwargs else None
 
-    incidents = {
-        "Info": [
-            "JSON was decode",
-            f"Package was download from URL: { url_path }"
-        ],
-        "Warning": [
-            "JSON is not valid",
-            f"JSON did not loaded from URL: { url_path }"
-        ],
-        "Error": [
-            f"No version was found in { url_name_list }",
-            f"Package download error from URL: { url_path }"
-        ],
-        "Disaster": [
-            "No one package was downloaded"
-        ]
-    }
-    yield f"{ datetime.now() } -- { incident_type } \t { url_name }:\t { incidents[incident_type][int(incident_code)] }"
+    incident = INCIDENTS[(incident_type, int(incident_code))].format_map(
+        {"url_path": url_path, "url_name_list": url_name_list})
+    return f"{ get_log_timestamp() } -- { incident_type } \t { url_name }:\t { incident }"
 
 
-def print_log_message(error_msg):
+def get_mv_from_urls(dict_with_urls: dict, json_validator: jsonschema.protocols.Validator, searched_field: str,
+                     on_version: Optional[Callable[[str], None]] = None):
     """
-    Print the messages from list
-    :param error_msg: List with messages
-    """
-    for msg in error_msg:
-        print(msg)
-
-
-def get_mv_from_urls(dict_with_urls: dict, dict_with_json_schema: dict, searched_field: str):
-    """
-    Taking URLSs from URL_CONFIG and getting the "modelsVersion" from the response
+    Taking URLSs from URL_CONFIG and getting the "modelsVersion" from the response.
+    All URLs are pinged concurrently, the log messages are printed in the config order.
     :param dict_with_urls: Dict with a url-name as a key and a url-path as a value.
         for example: {
                          "urls_with_model_version": {
@@ -101,8 +175,8 @@ def get_mv_from_urls(dict_with_urls: dict, dict_with_json_schema: dict, searched
                              "addin": "https://addin.efir-net.ru/v2/system/ping2"
                          }
                       }
-    :param dict_with_json_schema: Dict for the python module jsonschema, for validate loading from url json.
-        for example: {
+    :param json_validator: Validator of the python module jsonschema, for validate loading from url json.
+        It is built once from the scheme, for example: {
                          "type": "object",
                          "required": ["modelsVersion"],
                          "properties": {
@@ -115,31 +189,133 @@ def get_mv_from_urls(dict_with_urls: dict, dict_with_json_schema: dict, searched
                      }
     :param seached_field: The key of the value containing the version number.
         for example: "modelsVersion"
+    :param on_version: Optional func which is called with every found version as soon as its ping completes.
     :return: Dictionary with model versions.
         for example: "{'dh1': '1.0.166.1', 'dh2': '1.0.198.0', 'addin': '1.0.198.0'}"
     """
     model_versions = {}
-    url_name_list = []
+    urls = dict_with_urls["urls_with_model_version"]
+    url_name_list = list(urls)
+    incidents = {}
+
+    with ThreadPoolExecutor(max_workers=min(POOL_SIZE, len(urls)) or 1) as executor:
+        futures = {executor.submit(SESSION.get, url_path, timeout=PING_TIMEOUT): url_name
+                   for url_name, url_path in urls.items()}
+        for future in as_completed(futures):
+            url_name = futures[future]
+            try:
+                with future.result() as api_response:
+                    parsed = json.loads(api_response.content)
+                    # The schema pattern allows versions like "1.0.abc", which can't be compared
+                    if (is_json_valid(parsed, json_validator, searched_field)
+                            and parse_version(delete_closing_zero(parsed[searched_field])) is not None):
+                        model_versions[url_name] = delete_closing_zero(parsed[searched_field])
+                        incidents[url_name] = "Info 0"
+                        if on_version is not None:
+                            on_version(model_versions[url_name])
+                    else:
+                        incidents[url_name] = "Warning 0"
+            except (ValueError, requests.exceptions.RequestException):
+                # ValueError covers json.JSONDecodeError and UnicodeDecodeError of a not UTF-8 body
+                incidents[url_name] = "Warning 1"
+
+    for url_name, url_path in urls.items():
+        print(new_create_log_message(incidents[url_name], url_name=url_name, url_path=url_path))
+    return model_versions, url_name_list
+
 
-    for url_name, url_path in dict_with_urls["urls_with_model_version"].items():
-        url_name_list.append(url_name)
+def get_package_filename(content_disposition: str, url_path: str) -> str:
+    """
+    Take the file name of the package from the Content-Disposition header.
+    Only the last part of the name is used, so the server can't write the file outside END_FOLDER.
+    :param content_disposition: for example: attachment; filename="Efir.DataHub.Models.1.0.198.nupkg"
+    :param url_path: The URL of the package, for the error message
+    :return: for example: Efir.DataHub.Models.1.0.198.nupkg
+    """
+    match = CONTENT_DISPOSITION_FILENAME.search(content_disposition)
+    filename = Path(match.group(1).strip()).name if match else ""
+    if filename in ("", ".", ".."):
+        raise requests.exceptions.InvalidHeader(f"No package file name in Content-Disposition from URL: { url_path }")
+    return filename
+
+
+def download_package(url_path: str, cancel_event: Optional[threading.Event] = None) -> Optional[Path]:
+    """
+    The func downloads one Nuget package to END_FOLDER
+    :param url_path: The URL of the package,
+        for example: http://ef-proget.devel.ifx/nuget/Datahub/package/Efir.DataHub.Models/1.0.198
+    :param cancel_event: Optional event, if it is set the download is stopped and the partial file is deleted.
+        The partial file is deleted on a download error as well.
+    :return: The path of the downloaded file, or None if the download was cancelled.
+    """
+    with SESSION.get(url_path, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+        r.raise_for_status()
+        local_filename = END_FOLDER / get_package_filename(r.headers.get("Content-Disposition", ""), url_path)
         try:
-            with requests.get(url_path) as api_response:
-                parsed = json.loads(api_response.text)
-                if is_json_valid(parsed, dict_with_json_schema):
-                    model_versions[url_name] = delete_closing_zero(parsed[searched_field])
-                    incident = "Info 0"
+            with open(local_filename, 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                if HAS_FADVISE:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    f.write(chunk)
                 else:
-                    incident = "Warning 0"
-        except json.decoder.JSONDecodeError:
-            incident = "Warning 1"
-        print_log_message(new_create_log_message(incident, url_name=url_name, url_path=url_path))
-    return model_versions, url_name_list
+                    if HAS_FADVISE:
+                        # The package is not read back by the script, so its pages are written out and evicted
+                        f.flush()
+                        os.fdatasync(f.fileno())
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                    return local_filename
+        except BaseException:
+            local_filename.unlink(missing_ok=True)
+            raise
+        local_filename.unlink()
+        return None
+
+
+def download_model_packages(dict_with_urls: dict, dh_model_version: str,
+                            cancel_event: Optional[threading.Event] = None):
+    """
+    The func downloads Nuget package from URLs concurrently, without printing the log messages.
+    :param dict_with_urls: Dict with a url-name as a key and a url-path as a value,
+        see download_nuurls_with_model_package
+    :param dh_model_version: String with model version
+    :param cancel_event: Optional event for cancel the downloads, see download_package
+    :return: Tuple with the return code, the incidents and the paths of the downloaded files.
+        The return code is 0 if all packages were downloaded, 1 if not, and 2 if the downloads were cancelled.
+        The incidents are in the config order, for example: [("Info 1", "prgt", "http://.../1.0.198")]
+    """
+    return_code = 0
+    urls = {url_name: add_closing_slash(url_path) + dh_model_version
+            for url_name, url_path in dict_with_urls["urls_with_model_package"].items()}
+    incidents = {}
+    local_filenames = []
+
+    with ThreadPoolExecutor(max_workers=min(POOL_SIZE, len(urls)) or 1) as executor:
+        futures = {executor.submit(download_package, url_path, cancel_event): url_name
+                   for url_name, url_path in urls.items()}
+        for future in as_completed(futures):
+            url_name = futures[future]
+            try:
+                local_filename = future.result()
+                if local_filename is not None:
+                    local_filenames.append(local_filename)
+                    incidents[url_name] = "Info 1"
+                else:
+                    incidents[url_name] = "Warning 2"
+                    return_code = return_code or 2
+            except requests.exceptions.RequestException:
+                incidents[url_name] = "Error 1"
+                return_code = 1
+
+    incidents = [(incidents[url_name], url_name, url_path) for url_name, url_path in urls.items()]
+    return return_code, incidents, local_filenames
 
 
 def download_nuurls_with_model_package(dict_with_urls: dict, dh_model_version: str) -> int:
     """
-    The func downloads Nuget package from URLs
+    The func downloads Nuget package from URLs.
+    All packages are downloaded concurrently, the log messages are printed in the config order.
     :param dict_with_urls:  Dict with a url-name as a key and a url-path as a value.
         for example: {
                            "urls_with_model_package": {
@@ -147,22 +323,11 @@ def download_nuurls_with_model_package(dict_with_urls: dict, dh_model_version: s
                            }
                       }
     :param dh_model_version: String with model version
+    :return: 0 if all packages were downloaded, and 1 if not.
     """
-    return_code = 0
-    for url_name, url_path in dict_with_urls["urls_with_model_package"].items():
-        url_path = add_closing_slash(url_path) + dh_model_version
-        try:
-            with requests.get(url_path, stream=True) as r:
-                r.raise_for_status()
-                local_filename = Path(str(END_FOLDER) + "/" + r.headers["Content-Disposition"].split("=")[1].strip('"'))
-                with open(local_filename, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
-            incident = "Info 1"
-        except requests.exceptions.HTTPError:
-            incident = "Error 1"
-            return_code = 1
-        print_log_message(new_create_log_message(incident_name=incident, url_name=url_name, url_path=url_path))
+    return_code, incidents, _ = download_model_packages(dict_with_urls, dh_model_version)
+    for incident, url_name, url_path in incidents:
+        print(new_create_log_message(incident, url_name=url_name, url_path=url_path))
     return return_code
 
 
@@ -172,9 +337,7 @@ def delete_closing_zero(model_version: str) -> str:
     :param model_version: for example: 1.0.166.0
     :return: for example: 1.0.166
     """
-    if model_version[-2:] == ".0":
-        return model_version[:-2]
-    return model_version
+    return model_version[:-2] if model_version.endswith(".0") else model_version
 
 
 def add_closing_slash(url_path: str) -> str:
@@ -183,59 +346,118 @@ def add_closing_slash(url_path: str) -> str:
     :param url_path: for example: http://ef-proget.devel.ifx/nuget/Datahub/package/Efir.DataHub.Models
     :return: for example: http://ef-proget.devel.ifx/nuget/Datahub/package/Efir.DataHub.Models/
     """
-    if url_path[-1:] != "/":
-        url_path = url_path + "/"
-    return url_path
+    return url_path if url_path.endswith("/") else url_path + "/"
 
 
-def has_model_already_been_downloaded(downloaded_models_file: Path, model_version: str) -> bool:
+def load_downloaded_models(downloaded_models_file: Path) -> set:
     """
-    Finding model version in list with already downloaded version
+    Read the list with already downloaded versions once
     :param downloaded_models_file: The path of file with the list
+    :return: Set with versions of the models, for example: {"1.0.166", "1.0.198"}
+        The set is empty if the file doesn't exist yet.
+    """
+    try:
+        with open(downloaded_models_file, "r") as models_r:
+            return {line.rstrip() for line in models_r}
+    except FileNotFoundError:
+        return set()
+
+
+def has_model_already_been_downloaded(downloaded_models: set, model_version: str) -> bool:
+    """
+    Finding model version in list with already downloaded version
+    :param downloaded_models: Set with already downloaded versions, see load_downloaded_models
     :param model_version: The version of the model to be found in the list
     :return: Bool: True if the version of the model already was downloaded and False if not
     """
-    string_pattern = f"{ model_version } \n"
-
-    with open(downloaded_models_file, "r") as models_r:
-        return string_pattern in models_r
+    return model_version in downloaded_models
 
 
-def update_downloaded_mv_in_file(downloaded_models_file: Path, model_version: str):
+def update_downloaded_mv_in_file(models_w: TextIO, downloaded_models: set, model_version: str):
     """
     Write the version of model which been downloaded to the file
-    :param downloaded_models_file: The path of file with the list
+    :param models_w: The file with the list, opened for append once per run
+    :param downloaded_models: Set with already downloaded versions, it is updated as well as the file
     :param model_version: The version of the model to be write to the list
     """
-    string_pattern = f"{ model_version } \n"
-
-    with open(downloaded_models_file, "a+") as models_w:
-        models_w.write(string_pattern)
-
-
-def create_empty_file(filename: Path):
-    with open(filename, "w"):
-        pass
+    models_w.write(f"{ model_version }\n")
+    downloaded_models.add(model_version)
 
 
 def main():
     searched_field = "modelsVersion"
-    models, url_name_list = get_mv_from_urls(MAIN_CONFIG, DH_SCHEMA, searched_field)
-
-    if models:
-        dh_model_version = determine_senior_version(models)
-
-        if not os.path.exists(DOWNLOADED_MODELS):
-            create_empty_file(Path(DOWNLOADED_MODELS))
-
-        if not has_model_already_been_downloaded(DOWNLOADED_MODELS, dh_model_version):
-            download_code = download_nuurls_with_model_package(MAIN_CONFIG, dh_model_version)
-            if download_code == 0:
-                update_downloaded_mv_in_file(DOWNLOADED_MODELS, dh_model_version)
-    else:
-        print_log_message(new_create_log_message("Error 0", url_name_list=url_name_list))
-        print_log_message(new_create_log_message("Disaster 0"))
+    downloaded_models = load_downloaded_models(DOWNLOADED_MODELS)
+
+    # The first version which is senior to all downloaded and already pinged ones starts downloading
+    # while the other URLs are still pinged. If a more senior version is found, the download is cancelled,
+    # or its files are deleted if it has already finished. If the pings fail, the download is cancelled too,
+    # but a finished one is kept.
+    downloaded_versions = (parse_version(model_version) for model_version in downloaded_models)
+    senior_version = max((version for version in downloaded_versions if version is not None), default=None)
+    speculative_version, speculative_future, speculative_code = None, None, None
+    is_superseded = False
+    cancel_event = threading.Event()
+
+    with open(DOWNLOADED_MODELS, "a", buffering=1 << 16) as models_w:
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                def start_speculative_download(model_version: str):
+                    nonlocal senior_version, speculative_version, speculative_future, is_superseded
+                    version = parse_version(model_version)
+                    if version is None or (senior_version is not None and version <= senior_version):
+                        return
+                    senior_version = version
+
+                    if speculative_future is not None:
+                        is_superseded = True
+                        cancel_event.set()
+                    else:
+                        speculative_version = model_version
+                        speculative_future = executor.submit(
+                            download_model_packages, MAIN_CONFIG, model_version, cancel_event)
+
+                try:
+                    models, url_name_list = get_mv_from_urls(MAIN_CONFIG, DH_VALIDATOR, searched_field,
+                                                             on_version=start_speculative_download)
+                except BaseException:
+                    # Don't wait for the whole speculative download before the error is raised
+                    cancel_event.set()
+                    raise
+        finally:
+            # The log messages of the speculative download are printed after the ping ones,
+            # and its result is saved even if the pings failed
+            if speculative_future is not None:
+                speculative_code, incidents, local_filenames = speculative_future.result()
+                if is_superseded:
+                    for local_filename in local_filenames:
+                        local_filename.unlink(missing_ok=True)
+                    speculative_code = 2
+                for incident, url_name, url_path in incidents:
+                    if speculative_code == 2 and incident == "Info 1":
+                        incident = "Warning 2"
+                    print(new_create_log_message(incident, url_name=url_name, url_path=url_path))
+                if speculative_code == 0:
+                    update_downloaded_mv_in_file(models_w, downloaded_models, speculative_version)
+
+        if models:
+            dh_model_version = determine_senior_version(models)
+
+            # A failed speculative download of the same version is not repeated, only a cancelled one
+            already_tried = dh_model_version == speculative_version and speculative_code != 2
+            if not has_model_already_been_downloaded(downloaded_models, dh_model_version) and not already_tried:
+                download_code = download_nuurls_with_model_package(MAIN_CONFIG, dh_model_version)
+                if download_code == 0:
+                    update_downloaded_mv_in_file(models_w, downloaded_models, dh_model_version)
+        models_w.flush()
+        os.fsync(models_w.fileno())
+
+    if not models:
+        print(new_create_log_message("Error 0", url_name_list=url_name_list))
+        print(new_create_log_message("Disaster 0"))
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        SESSION.close()